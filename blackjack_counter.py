@@ -5,86 +5,377 @@ Real-time card detection with full deck composition tracking
 and optimal bet sizing using Kelly Criterion
 """
 
+import os
+import json
+import bisect
 import cv2
 import numpy as np
 import mss
-import time
-from collections import defaultdict
+from collections import defaultdict, Counter
 import tkinter as tk
 from tkinter import ttk
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
 class CardDetector:
     """Detects playing cards from screen captures using computer vision"""
 
-    def __init__(self):
+    # Max Hamming distance between corner hashes for a rank to match
+    MAX_HASH_DISTANCE = 10
+    # Width (px) the blob search runs at; ROIs are still cropped natively
+    WORK_WIDTH = 640
+    # Size (w, h) reference corners are normalized to for template matching,
+    # and the lowest normalized correlation accepted as a match
+    TEMPLATE_SIZE = (40, 60)
+    MIN_MATCH_SCORE = 0.7
+
+    def __init__(self, templates_dir=None, use_opencl=None):
         self.card_templates = {}
         self.card_ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
 
+        # Reference rank corners (templates/<rank>.png), their dHashes and
+        # their grayscale versions at TEMPLATE_SIZE for template matching
+        if templates_dir is None:
+            templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+        self._ref_hashes = {}
+        self._match_bank = []
+        for rank in self.card_ranks:
+            path = os.path.join(templates_dir, f'{rank}.png')
+            image = cv2.imread(path) if os.path.isfile(path) else None
+            if image is not None:
+                self.card_templates[rank] = image
+                self._ref_hashes[self._dhash(image)] = rank
+                self._match_bank.append((rank, cv2.resize(
+                    cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), self.TEMPLATE_SIZE, interpolation=cv2.INTER_AREA
+                )))
+
+        # Scratch buffers and size-dependent constants, set up by
+        # _configure when the capture size changes
+        self._downscale = 1.0
+        self._small_size = None
+        self._min_area = None
+        self._max_area = None
+        self._gray = None
+        self._small = None
+        self._mean = None
+        self._thresh = None
+
+        # Run the per-pixel preprocessing on a CUDA stream when OpenCV was
+        # built with CUDA and a device is present
+        try:
+            self._use_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            self._use_cuda = False
+
+        if self._use_cuda:
+            self._stream = cv2.cuda.Stream()
+            self._g_frame = cv2.cuda_GpuMat()
+            self._g_gray = cv2.cuda_GpuMat()
+            self._g_small = cv2.cuda_GpuMat()
+            self._g_mean = cv2.cuda_GpuMat()
+            self._g_thresh = cv2.cuda_GpuMat()
+            self._g_offset = None
+            self._g_box = cv2.cuda.createBoxFilter(
+                cv2.CV_8UC1, cv2.CV_8UC1, (11, 11), borderMode=cv2.BORDER_REPLICATE
+            )
+
+        # Otherwise let OpenCV's transparent API dispatch to OpenCL (e.g. an
+        # integrated GPU) by feeding it cv2.UMat inputs. Some drivers are
+        # slower or unstable, so it can be turned off (BLACKJACK_OPENCL=0)
+        if use_opencl is None:
+            use_opencl = os.environ.get('BLACKJACK_OPENCL', '1') != '0'
+        self._use_opencl = use_opencl and not self._use_cuda and cv2.ocl.haveOpenCL()
+
     def detect_cards(self, frame):
         """
-        Detect cards in the given frame using contour detection and pattern matching
-        Returns list of detected card ranks
+        Detect cards in the given frame using connected-component analysis and pattern matching
+        Returns list of (rank, center_x, center_y) - the card centroid in frame pixels
         """
         detected_cards = []
 
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Without reference corners no card can be identified, so there is
+        # nothing to report - skip the whole pipeline
+        if not self._ref_hashes:
+            return detected_cards
 
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._configure(*frame.shape[:2])
 
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(
-            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 11, 2
-        )
+        # Screen captures arrive as raw BGRA; plain BGR frames are accepted too
+        gray_code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
 
-        # Find contours
-        contours, _ = cv2.findContours(
-            thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-        )
+        if self._use_cuda:
+            thresh = self._threshold_cuda(frame, gray_code)
+        elif self._use_opencl:
+            thresh = self._threshold_opencl(frame, gray_code)
+        else:
+            # Convert to grayscale
+            cv2.cvtColor(frame, gray_code, dst=self._gray)
+
+            if self._downscale > 1:
+                cv2.resize(self._gray, self._small_size, dst=self._small, interpolation=cv2.INTER_AREA)
+
+            # Adaptive thresholding as a single box-mean pass: src > mean - C
+            cv2.boxFilter(self._small, -1, (11, 11), dst=self._mean, borderType=cv2.BORDER_REPLICATE)
+            cv2.subtract(self._mean, 2, dst=self._mean)
+            cv2.compare(self._small, self._mean, cv2.CMP_GT, dst=self._thresh)
+            thresh = self._thresh
+
+        # Label connected blobs - one C pass yields every bounding box and
+        # area as arrays, so all filtering below is vectorized
+        _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+
+        # Label 0 is the background
+        rects = stats[1:, :4]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+
+        # Cards have an aspect ratio around 1.4 (poker card ratio) and a
+        # reasonable area (adjust based on screen size)
+        aspect_ratios = rects[:, 3] / np.maximum(rects[:, 2], 1)
+        is_card = ((1.2 < aspect_ratios) & (aspect_ratios < 1.6) &
+                   (self._min_area < areas) & (areas < self._max_area))
+
+        # Scale the survivors back to full resolution
+        rects = rects[is_card]
+        if self._downscale > 1:
+            rects = np.rint(rects * self._downscale).astype(np.int32)
+
+        for x, y, w, h in rects.tolist():
+            # Extract card region at native resolution
+            card_roi = frame[y:y+h, x:x+w]
+            # Attempt to identify the card
+            card_rank = self._identify_card(card_roi)
+            if card_rank:
+                detected_cards.append((card_rank, x + w // 2, y + h // 2))
 
-        # Filter contours that could be cards
-        for contour in contours:
-            area = cv2.contourArea(contour)
+        return detected_cards
 
-            # Cards should have a reasonable area (adjust based on screen size)
-            if 1000 < area < 50000:
-                # Get bounding rectangle
-                x, y, w, h = cv2.boundingRect(contour)
+    def _configure(self, h, w):
+        """
+        Specialize the pipeline for an h x w capture
+        Runs only when the capture size changes (e.g. a new region is
+        selected): picks the working scale, derives the size-dependent
+        constants and allocates the scratch buffers
+        """
+        # Captures wider than WORK_WIDTH are shrunk to that width - card
+        # outlines survive it and every following stage scales with the
+        # pixel count (~9x fewer for a 1080p monitor). Narrower
+        # (region-selected) captures are processed at full resolution
+        if w > self.WORK_WIDTH:
+            small_w = self.WORK_WIDTH
+            small_h = max(1, round(h * small_w / w))
+            self._downscale = w / small_w
+        else:
+            small_w, small_h = w, h
+            self._downscale = 1.0
+        self._small_size = (small_w, small_h)
+
+        # Card area limits (1000-50000 pixels at full resolution) in
+        # working-image pixels
+        area_scale = self._downscale * self._downscale
+        self._min_area = 1000 / area_scale
+        self._max_area = 50000 / area_scale
+
+        self._gray = np.empty((h, w), dtype=np.uint8)
+        if self._downscale > 1:
+            self._small = np.empty((small_h, small_w), dtype=np.uint8)
+        else:
+            self._small = self._gray
+        self._mean = np.empty_like(self._small)
+        self._thresh = np.empty_like(self._small)
 
-                # Cards have an aspect ratio around 1.4 (poker card ratio)
-                aspect_ratio = float(h) / w if w > 0 else 0
+        if self._use_cuda:
+            # Constant C of the adaptive threshold, as a device image
+            self._g_offset = cv2.cuda_GpuMat(small_h, small_w, cv2.CV_8UC1, (2,))
 
-                if 1.2 < aspect_ratio < 1.6:
-                    # Extract card region
-                    card_roi = frame[y:y+h, x:x+w]
+    def _threshold_cuda(self, frame, gray_code):
+        """
+        GPU version of the grayscale / downscale / adaptive threshold stages
+        Only the binary mask is downloaded (into self._thresh) for findContours
+        Returns the binary mask
+        """
+        stream = self._stream
+        self._g_frame.upload(frame, stream)
+        cv2.cuda.cvtColor(self._g_frame, gray_code, dst=self._g_gray, stream=stream)
+
+        g_small = self._g_gray
+        if self._downscale > 1:
+            cv2.cuda.resize(self._g_gray, self._small_size, dst=self._g_small,
+                            interpolation=cv2.INTER_AREA, stream=stream)
+            g_small = self._g_small
+
+        # Same box-mean identity as the CPU path: src > mean - C
+        self._g_box.apply(g_small, dst=self._g_mean, stream=stream)
+        cv2.cuda.subtract(self._g_mean, self._g_offset, dst=self._g_mean, stream=stream)
+        cv2.cuda.compare(g_small, self._g_mean, cv2.CMP_GT, dst=self._g_thresh, stream=stream)
+
+        self._g_thresh.download(stream, self._thresh)
+        stream.waitForCompletion()
+        return self._thresh
+
+    def _threshold_opencl(self, frame, gray_code):
+        """
+        OpenCL (T-API) version of the grayscale / downscale / adaptive threshold stages
+        Returns the binary mask as a host array for findContours, which has no UMat support
+        """
+        u_gray = cv2.cvtColor(cv2.UMat(frame), gray_code)
 
-                    # Attempt to identify the card
-                    card_rank = self._identify_card(card_roi)
-                    if card_rank:
-                        detected_cards.append(card_rank)
+        if self._downscale > 1:
+            u_gray = cv2.resize(u_gray, self._small_size, interpolation=cv2.INTER_AREA)
 
-        return detected_cards
+        # Same box-mean identity as the CPU path: src > mean - C
+        u_mean = cv2.boxFilter(u_gray, -1, (11, 11), borderType=cv2.BORDER_REPLICATE)
+        u_thresh = cv2.compare(u_gray, cv2.subtract(u_mean, 2), cv2.CMP_GT)
+
+        return u_thresh.get()
 
     def _identify_card(self, card_roi):
         """
         Identify card rank from card region of interest
-        This is a simplified implementation - in production, you'd use template matching
-        or a trained ML model for better accuracy
+        Compares a 64-bit difference hash (dHash) of the rank corner against
+        the reference corners loaded from the templates directory, falling
+        back to template matching when no hash is close enough
+        Returns the rank, or None if no reference matches
         """
-        # For demonstration, we'll use OCR-like pattern matching
-        # In a real implementation, you'd use pre-trained templates or neural networks
+        if not self._ref_hashes:
+            return None
 
-        # Extract the corner region where rank is typically displayed
+        # Extract the corner region where rank is typically displayed (top-left
+        # quarter). The strided view is fine for OpenCV - rows stay contiguous
         h, w = card_roi.shape[:2]
-        corner = card_roi[0:int(h*0.25), 0:int(w*0.25)]
+        corner = card_roi[:h >> 2, :w >> 2]
+        if corner.size == 0:
+            return None
+
+        corner_hash = self._dhash(corner)
+
+        rank = self._ref_hashes.get(corner_hash)
+        if rank is not None:
+            return rank
+
+        # Nearest reference by Hamming distance - only 13 to check
+        best_rank, best_distance = None, self.MAX_HASH_DISTANCE
+        for ref_hash, ref_rank in self._ref_hashes.items():
+            distance = bin(corner_hash ^ ref_hash).count('1')
+            if distance <= best_distance:
+                best_rank, best_distance = ref_rank, distance
+        if best_rank is not None:
+            return best_rank
+
+        return self._match_corner(corner)
+
+    def _match_corner(self, corner):
+        """
+        Template-match the rank corner against every reference corner
+        Returns the best scoring rank, or None if none reaches MIN_MATCH_SCORE
+        """
+        if corner.ndim == 3:
+            gray_code = cv2.COLOR_BGRA2GRAY if corner.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            corner = cv2.cvtColor(corner, gray_code)
+
+        # Search a slightly larger image so a loosely cropped corner still lines up
+        tw, th = self.TEMPLATE_SIZE
+        search = cv2.resize(corner, (tw + tw // 10, th + th // 10), interpolation=cv2.INTER_AREA)
+
+        best_rank, best_score = None, self.MIN_MATCH_SCORE
+        for rank, template in self._match_bank:
+            score = cv2.matchTemplate(search, template, cv2.TM_CCOEFF_NORMED).max()
+            if score >= best_score:
+                best_rank, best_score = rank, score
+        return best_rank
+
+    @staticmethod
+    def _dhash(image):
+        """64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail"""
+        if image.ndim == 3:
+            gray_code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            image = cv2.cvtColor(image, gray_code)
+        thumb = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(thumb[:, 1:] > thumb[:, :-1])
+        return int.from_bytes(bits.tobytes(), 'big')
+
+
+class CardTracker:
+    """
+    Follows detected cards across frames by centroid and rank so each
+    physical card is counted exactly once - a rank dealt twice in a row
+    gives two tracks, a different rank dealt to the same spot is a new
+    card, and a card missed for a frame or two keeps its track
+    """
+
+    def __init__(self, max_distance=30, max_missed=4):
+        # Max centroid movement (px) between frames for the same card, and
+        # how many processed frames a card may go undetected before its
+        # track is retired
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.reset()
+
+    def reset(self):
+        """Forget all tracks"""
+        self._tracks = {}  # track_id -> (center_x, center_y, rank, last_seen_frame)
+        self._last_ids = []  # tracks matched by the last update
+        self._next_id = 0
+        self._frame = 0
+
+    def update(self, detections):
+        """
+        Match one frame's (rank, center_x, center_y) detections to the live tracks
+        Returns: ranks of the detections that started a new track (new cards)
+        """
+        self._frame += 1
+        new_ranks = []
+        matched = []
+        unmatched = dict(self._tracks)
+        max_d2 = self.max_distance * self.max_distance
+
+        for rank, cx, cy in detections:
+            # Nearest live track of the same rank not already claimed this frame
+            best_id, best_d2 = None, max_d2
+            for track_id, (tx, ty, track_rank, _) in unmatched.items():
+                if track_rank != rank:
+                    continue
+                d2 = (tx - cx) * (tx - cx) + (ty - cy) * (ty - cy)
+                if d2 <= best_d2:
+                    best_id, best_d2 = track_id, d2
+
+            if best_id is None:
+                best_id = self._next_id
+                self._next_id += 1
+                new_ranks.append(rank)
+            else:
+                del unmatched[best_id]
+
+            self._tracks[best_id] = (cx, cy, rank, self._frame)
+            matched.append(best_id)
 
-        # This is a placeholder - real implementation would do actual OCR
-        # or template matching with pre-loaded card images
-        return None
+        self._last_ids = matched
+        self._retire()
+        return new_ranks
+
+    def shift(self, dx, dy):
+        """Move every live track by (dx, dy), e.g. when the capture region moves"""
+        self._tracks = {track_id: (tx + dx, ty + dy, rank, last_seen)
+                        for track_id, (tx, ty, rank, last_seen) in self._tracks.items()}
+
+    def repeat(self):
+        """
+        Advance one frame that showed the same picture as the last update
+        (detection was skipped): its cards are seen again, missing ones keep aging
+        """
+        self._frame += 1
+        for track_id in self._last_ids:
+            tx, ty, rank, _ = self._tracks[track_id]
+            self._tracks[track_id] = (tx, ty, rank, self._frame)
+        self._retire()
+
+    def _retire(self):
+        """Drop tracks whose card has been gone for more than max_missed frames"""
+        expired = [track_id for track_id, (_, _, _, last_seen) in self._tracks.items()
+                   if self._frame - last_seen > self.max_missed]
+        for track_id in expired:
+            del self._tracks[track_id]
 
 
 class CompositionTracker:
@@ -97,40 +388,109 @@ class CompositionTracker:
         self.num_decks = num_decks
         self.ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
 
-        # Initialize remaining cards (4 per deck for each rank)
-        self.remaining = {}
+        self._rank_index = {rank: i for i, rank in enumerate(self.ranks)}
+
+        # Effect of Removal (EOR) values - how much each card affects player advantage
+        # These are approximate values based on blackjack basic strategy simulations
+        # Positive EOR = removing helps player, Negative EOR = removing hurts player
+        # Ordered like self.ranks: removing 5s helps the player most, aces hurt most
+        self.eor = np.array([
+            0.40, 0.43, 0.52, 0.67, 0.45, 0.30, 0.01, -0.19,  # 2-9
+            -0.51, -0.51, -0.51, -0.51,                       # 10, J, Q, K
+            -0.59,                                            # A
+        ], dtype=np.float32)
+
+        # Base dealer bust probabilities for each upcard (with S17 rules, neutral deck)
+        # These are the probabilities when dealer must hit to 17
+        # Ordered like self.ranks: dealer shows 5 or 6 busts most, ace least
+        self.base_bust_rates = np.array([
+            35.30, 37.56, 40.28, 42.89, 42.08,  # 2-6
+            25.99, 23.86, 23.34,                # 7-9
+            21.43, 21.43, 21.43, 21.43,         # 10, J, Q, K
+            11.65,                              # A
+        ])
+
+        # Composition as per-rank counts ordered like self.ranks (4 per deck
+        # for each rank); the original shoe is kept for reference
+        self.initial_arr = np.full(len(self.ranks), 4 * num_decks, dtype=np.int16)
+        self._total_initial = int(self.initial_arr.sum())
+
+        # Constant parts of the advantage sum (see calculate_player_advantage):
+        # EOR of the full shoe, and EOR of one card removed in proportion
+        self._initial_eor = float(self.initial_arr @ self.eor)
+        self._share_eor = self._initial_eor / self._total_initial
+
+        # Kelly Criterion f* = edge / variance (variance ~1.3 for blackjack),
+        # scaled to 1/4 Kelly for risk management
+        self._kelly_coeff = 0.25 / 1.3
+
+        # Derived values (advantage, Kelly bet, ...) computed since the
+        # composition last changed; cleared by every update. version counts
+        # the updates, so observers can tell whether anything changed
+        self._cache = {}
+        self.version = 0
+
         self.reset()
 
-        # Store original composition for reference
-        self.initial_cards = dict(self.remaining)
+    @property
+    def remaining(self):
+        """Remaining cards per rank as a dict (a snapshot of remaining_arr)"""
+        return dict(zip(self.ranks, self.remaining_arr.tolist()))
 
     def reset(self):
         """Reset to full shoe"""
-        self.remaining = {rank: 4 * self.num_decks for rank in self.ranks}
-        self.cards_seen = []
+        self.remaining_arr = self.initial_arr.copy()
+        self.dealt = 0
+        self._cache.clear()
+        self.version += 1
 
     def add_card(self, rank):
         """Record a seen card and update composition"""
-        if rank in self.remaining and self.remaining[rank] > 0:
-            self.remaining[rank] -= 1
-            self.cards_seen.append(rank)
-            return True
-        return False
+        idx = self._rank_index.get(rank)
+        if idx is None or self.remaining_arr[idx] == 0:
+            return False
+
+        self.remaining_arr[idx] -= 1
+        self.dealt += 1
+        self._cache.clear()
+        self.version += 1
+        return True
+
+    def add_cards(self, ranks):
+        """
+        Record a batch of seen cards with one update per distinct rank
+        Returns the number of cards actually recorded
+        """
+        added = 0
+        for rank, count in Counter(ranks).items():
+            idx = self._rank_index.get(rank)
+            if idx is None:
+                continue
+            taken = min(count, int(self.remaining_arr[idx]))
+            if taken > 0:
+                self.remaining_arr[idx] -= taken
+                self.dealt += taken
+                added += taken
+        if added:
+            self._cache.clear()
+            self.version += 1
+        return added
 
     def get_total_remaining(self):
         """Get total number of cards remaining in shoe"""
-        return sum(self.remaining.values())
+        # Every recorded card decrements remaining_arr and increments dealt
+        return self._total_initial - self.dealt
 
     def get_cards_dealt(self):
         """Get total number of cards dealt"""
-        return len(self.cards_seen)
+        return self.dealt
 
     def get_composition_percentage(self, rank):
         """Get percentage of specific rank in remaining cards"""
         total = self.get_total_remaining()
         if total == 0:
             return 0.0
-        return (self.remaining[rank] / total) * 100
+        return (self.remaining_arr[self._rank_index[rank]] / total) * 100
 
     def calculate_player_advantage(self):
         """
@@ -139,51 +499,24 @@ class CompositionTracker:
 
         Returns: advantage as percentage (e.g., 0.5 = 0.5% player advantage)
         """
+        if 'advantage' in self._cache:
+            return self._cache['advantage']
+
         total_remaining = self.get_total_remaining()
 
         if total_remaining == 0:
-            return 0.0
-
-        # Effect of Removal (EOR) values - how much each card affects player advantage
-        # These are approximate values based on blackjack basic strategy simulations
-        # Positive EOR = removing helps player, Negative EOR = removing hurts player
-        eor_values = {
-            '2': 0.40,   # Removing 2s helps player
-            '3': 0.43,   # Removing 3s helps player
-            '4': 0.52,   # Removing 4s helps player (most beneficial)
-            '5': 0.67,   # Removing 5s helps player significantly
-            '6': 0.45,   # Removing 6s helps player
-            '7': 0.30,   # Removing 7s slightly helps player
-            '8': 0.01,   # Removing 8s nearly neutral
-            '9': -0.19,  # Removing 9s slightly hurts player
-            '10': -0.51, # Removing 10s hurts player
-            'J': -0.51,  # Face cards hurt player when removed
-            'Q': -0.51,
-            'K': -0.51,
-            'A': -0.59,  # Removing aces hurts player most
-        }
-
-        # Calculate expected composition for neutral shoe
-        expected_per_rank = 4 * self.num_decks / 13
-        expected_percentage = (expected_per_rank / (52 * self.num_decks)) * 100
-
-        # Calculate advantage based on deviation from expected composition
-        advantage = 0.0
-
-        for rank in self.ranks:
-            current_percentage = self.get_composition_percentage(rank)
-            expected = (self.initial_cards[rank] / sum(self.initial_cards.values())) * 100
-
-            # If this rank is depleted more than expected, that's equivalent to removal
-            cards_removed = self.initial_cards[rank] - self.remaining[rank]
-            expected_removed = self.get_cards_dealt() * (self.initial_cards[rank] / sum(self.initial_cards.values()))
-
-            excess_removal = cards_removed - expected_removed
+            advantage = 0.0
+        else:
+            # A rank depleted more than its share of the cards dealt so far is
+            # equivalent to removing the excess; apply EOR to each rank's excess.
+            # sum((initial - remaining - dealt * share) * eor) expands to the
+            # constants above minus a single 13-element dot product
+            excess_eor = (self._initial_eor - float(self.remaining_arr @ self.eor)
+                          - self.dealt * self._share_eor)
 
-            # Apply EOR to calculate advantage contribution
-            if excess_removal != 0:
-                advantage += (excess_removal / self.get_total_remaining()) * eor_values[rank] * 100
+            advantage = excess_eor / total_remaining * 100
 
+        self._cache['advantage'] = advantage
         return advantage
 
     def get_kelly_bet(self, bankroll_units=100, edge_threshold=0.005):
@@ -196,82 +529,50 @@ class CompositionTracker:
 
         Returns: Optimal bet size in units
         """
-        advantage = self.calculate_player_advantage() / 100  # Convert to decimal
+        key = ('kelly', bankroll_units, edge_threshold)
+        if key in self._cache:
+            return self._cache[key]
+
+        advantage = self.calculate_player_advantage() * 0.01  # Convert to decimal
 
         # Don't bet if edge is negative or below threshold
         if advantage < edge_threshold:
-            return 1.0  # Minimum bet
-
-        # Kelly Criterion: f* = edge / variance
-        # For blackjack, variance is approximately 1.3
-        variance = 1.3
-        kelly_fraction = advantage / variance
-
-        # Use fractional Kelly (1/4 Kelly) for risk management
-        fractional_kelly = 0.25
-        optimal_fraction = kelly_fraction * fractional_kelly
-
-        # Calculate bet in units
-        optimal_bet = bankroll_units * optimal_fraction
-
-        # Round to reasonable bet sizes and enforce limits
-        optimal_bet = max(1.0, min(optimal_bet, bankroll_units * 0.1))  # Max 10% of bankroll
-        optimal_bet = round(optimal_bet * 2) / 2  # Round to nearest 0.5 units
+            optimal_bet = 1.0  # Minimum bet
+        else:
+            # Fractional Kelly bet in units, capped at 10% of bankroll and
+            # rounded to the nearest 0.5 units
+            optimal_bet = bankroll_units * advantage * self._kelly_coeff
+            optimal_bet = max(1.0, min(optimal_bet, bankroll_units * 0.1))
+            optimal_bet = round(optimal_bet * 2) * 0.5
 
+        self._cache[key] = optimal_bet
         return optimal_bet
 
     def get_penetration_percentage(self):
         """Get shoe penetration (percentage of cards dealt)"""
-        total_cards = sum(self.initial_cards.values())
-        dealt = self.get_cards_dealt()
-        return (dealt / total_cards) * 100 if total_cards > 0 else 0
+        if 'penetration' not in self._cache:
+            total_cards = self._total_initial
+            dealt = self.get_cards_dealt()
+            self._cache['penetration'] = (dealt / total_cards) * 100 if total_cards > 0 else 0
+        return self._cache['penetration']
 
-    def calculate_dealer_bust_probability(self):
+    def _composition_adjustment(self, total_remaining):
         """
-        Calculate dealer bust probability based on current deck composition
-
-        Returns weighted average dealer bust probability across all possible dealer upcards
-        Higher values = more likely dealer busts = better for player
+        Shift (in percentage points) of dealer bust rates for the current composition
+        More high cards (10s) remaining = higher dealer bust probability
+        More low cards remaining = lower dealer bust probability
         """
-        total_remaining = self.get_total_remaining()
-
-        if total_remaining == 0:
-            return 0.0
-
-        # Base dealer bust probabilities for each upcard (with S17 rules, neutral deck)
-        # These are the probabilities when dealer must hit to 17
-        base_bust_rates = {
-            '2': 35.30,   # Dealer shows 2
-            '3': 37.56,   # Dealer shows 3
-            '4': 40.28,   # Dealer shows 4
-            '5': 42.89,   # Dealer shows 5
-            '6': 42.08,   # Dealer shows 6
-            '7': 25.99,   # Dealer shows 7
-            '8': 23.86,   # Dealer shows 8
-            '9': 23.34,   # Dealer shows 9
-            '10': 21.43,  # Dealer shows 10
-            'J': 21.43,   # Dealer shows J
-            'Q': 21.43,   # Dealer shows Q
-            'K': 21.43,   # Dealer shows K
-            'A': 11.65,   # Dealer shows A
-        }
-
-        # Calculate how composition affects bust probability
-        # More high cards (10s) remaining = higher dealer bust probability
-        # More low cards remaining = lower dealer bust probability
-
         # Get percentage of 10-value cards in remaining deck
-        ten_value_cards = (self.remaining['10'] + self.remaining['J'] +
-                          self.remaining['Q'] + self.remaining['K'])
-        ten_percentage = (ten_value_cards / total_remaining) if total_remaining > 0 else 0
+        ten_value_cards = int(self.remaining_arr[8:12].sum())  # 10, J, Q, K
+        ten_percentage = ten_value_cards / total_remaining
 
         # Normal 10-value percentage is 4/13 ≈ 30.77%
         normal_ten_percentage = 4.0 / 13.0
         ten_richness = ten_percentage / normal_ten_percentage  # >1 = rich in tens, <1 = poor in tens
 
         # Get percentage of low cards (2-6) in remaining deck
-        low_cards = sum(self.remaining[rank] for rank in ['2', '3', '4', '5', '6'])
-        low_percentage = (low_cards / total_remaining) if total_remaining > 0 else 0
+        low_cards = int(self.remaining_arr[:5].sum())  # 2-6
+        low_percentage = low_cards / total_remaining
 
         # Normal low card percentage is 5/13 ≈ 38.46%
         normal_low_percentage = 5.0 / 13.0
@@ -280,28 +581,28 @@ class CompositionTracker:
         # Adjustment factor: more 10s = higher bust rate, more low cards = lower bust rate
         # Each 10% increase in ten-richness adds ~3% to bust probability
         # Each 10% increase in low-richness subtracts ~2% from bust probability
-        adjustment = ((ten_richness - 1.0) * 15.0) - ((low_richness - 1.0) * 10.0)
+        return ((ten_richness - 1.0) * 15.0) - ((low_richness - 1.0) * 10.0)
 
-        # Calculate weighted average bust probability across all possible dealer upcards
-        weighted_bust_prob = 0.0
-        total_weight = 0.0
+    def calculate_dealer_bust_probability(self):
+        """
+        Calculate dealer bust probability based on current deck composition
 
-        for rank in self.ranks:
-            if self.remaining[rank] > 0:
-                # Weight by probability of this card being dealer upcard
-                weight = self.remaining[rank] / total_remaining
-                # Adjust base bust rate by composition
-                adjusted_bust_rate = base_bust_rates[rank] + adjustment
-                # Clamp between 5% and 60%
-                adjusted_bust_rate = max(5.0, min(60.0, adjusted_bust_rate))
+        Returns weighted average dealer bust probability across all possible dealer upcards
+        Higher values = more likely dealer busts = better for player
+        """
+        if 'dealer_bust' in self._cache:
+            return self._cache['dealer_bust']
 
-                weighted_bust_prob += adjusted_bust_rate * weight
-                total_weight += weight
+        total_remaining = self.get_total_remaining()
 
-        if total_weight > 0:
-            return weighted_bust_prob / total_weight
+        if total_remaining == 0:
+            dealer_bust = 0.0
+        else:
+            # Weight each upcard's adjusted bust rate by the probability of that upcard
+            dealer_bust = float(self._adjusted_bust_rates() @ self.remaining_arr) / total_remaining
 
-        return 28.0  # Default average dealer bust rate
+        self._cache['dealer_bust'] = dealer_bust
+        return dealer_bust
 
     def get_dealer_bust_for_upcard(self, upcard):
         """
@@ -317,29 +618,21 @@ class CompositionTracker:
         if total_remaining == 0 or upcard not in self.ranks:
             return 0.0
 
-        # Base bust rates
-        base_bust_rates = {
-            '2': 35.30, '3': 37.56, '4': 40.28, '5': 42.89, '6': 42.08,
-            '7': 25.99, '8': 23.86, '9': 23.34,
-            '10': 21.43, 'J': 21.43, 'Q': 21.43, 'K': 21.43, 'A': 11.65,
-        }
+        return float(self._adjusted_bust_rates()[self._rank_index[upcard]])
 
-        # Calculate composition adjustment
-        ten_value_cards = (self.remaining['10'] + self.remaining['J'] +
-                          self.remaining['Q'] + self.remaining['K'])
-        ten_percentage = (ten_value_cards / total_remaining) if total_remaining > 0 else 0
-        normal_ten_percentage = 4.0 / 13.0
-        ten_richness = ten_percentage / normal_ten_percentage
-
-        low_cards = sum(self.remaining[rank] for rank in ['2', '3', '4', '5', '6'])
-        low_percentage = (low_cards / total_remaining) if total_remaining > 0 else 0
-        normal_low_percentage = 5.0 / 13.0
-        low_richness = low_percentage / normal_low_percentage
-
-        adjustment = ((ten_richness - 1.0) * 15.0) - ((low_richness - 1.0) * 10.0)
-
-        adjusted_bust_rate = base_bust_rates[upcard] + adjustment
-        return max(5.0, min(60.0, adjusted_bust_rate))
+    def _adjusted_bust_rates(self):
+        """
+        Per-upcard dealer bust rates adjusted by composition and clamped
+        between 5% and 60%, ordered like self.ranks
+        Cached until the composition changes - the strategy EVs look up one
+        upcard many times per recommendation. Needs cards remaining
+        """
+        rates = self._cache.get('bust_rates')
+        if rates is None:
+            adjustment = self._composition_adjustment(self.get_total_remaining())
+            rates = np.clip(self.base_bust_rates + adjustment, 5.0, 60.0)
+            self._cache['bust_rates'] = rates
+        return rates
 
 
 class StrategyEngine:
@@ -347,6 +640,69 @@ class StrategyEngine:
     Blackjack strategy engine with basic strategy and composition-dependent deviations
     """
 
+    # Card values (aces counted as 11) and the ranks worth 10
+    CARD_VALUES = {
+        '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
+        '10': 10, 'J': 10, 'Q': 10, 'K': 10, 'A': 11,
+    }
+    TEN_VALUE = frozenset({'10', 'J', 'Q', 'K'})
+
+    # Basic strategy charts: one row per player hand, one column per dealer
+    # upcard (2-9, 10, A). H = hit, S = stand, P = split, D = double (else
+    # hit), Ds = double (else stand), R = surrender (else hit)
+    HARD_CHART = {
+        8:  'H  H  H  H  H  H  H  H  H  H'.split(),  # 8 or less
+        9:  'H  D  D  D  D  H  H  H  H  H'.split(),
+        10: 'D  D  D  D  D  D  D  D  H  H'.split(),
+        11: 'D  D  D  D  D  D  D  D  D  D'.split(),
+        12: 'H  H  S  S  S  H  H  H  H  H'.split(),
+        13: 'S  S  S  S  S  H  H  H  H  H'.split(),
+        14: 'S  S  S  S  S  H  H  H  H  H'.split(),
+        15: 'S  S  S  S  S  H  H  H  R  H'.split(),
+        16: 'S  S  S  S  S  H  H  R  R  R'.split(),
+        17: 'S  S  S  S  S  S  S  S  S  S'.split(),  # 17 or more
+    }
+    SOFT_CHART = {
+        12: 'H  H  H  H  H  H  H  H  H  H'.split(),  # 12 or less
+        13: 'H  H  H  D  D  H  H  H  H  H'.split(),
+        14: 'H  H  H  D  D  H  H  H  H  H'.split(),
+        15: 'H  H  D  D  D  H  H  H  H  H'.split(),
+        16: 'H  H  D  D  D  H  H  H  H  H'.split(),
+        17: 'H  D  D  D  D  H  H  H  H  H'.split(),
+        18: 'Ds Ds Ds Ds Ds S  S  H  H  H'.split(),
+        19: 'S  S  S  S  S  S  S  S  S  S'.split(),  # 19 or more
+    }
+    PAIR_CHART = {
+        '2':  'P  P  P  P  P  P  H  H  H  H'.split(),
+        '3':  'P  P  P  P  P  P  H  H  H  H'.split(),
+        '4':  'H  H  H  P  P  H  H  H  H  H'.split(),
+        '5':  'D  D  D  D  D  D  D  D  H  H'.split(),
+        '6':  'P  P  P  P  P  H  H  H  H  H'.split(),
+        '7':  'P  P  P  P  P  P  H  H  H  H'.split(),
+        '8':  'P  P  P  P  P  P  P  P  P  P'.split(),
+        '9':  'P  P  P  P  P  S  P  P  S  S'.split(),
+        '10': 'S  S  S  S  S  S  S  S  S  S'.split(),
+        'A':  'P  P  P  P  P  P  P  P  P  P'.split(),
+    }
+    CHART_ACTIONS = {'H': "HIT", 'S': "STAND", 'P': "SPLIT"}
+
+    # Rough distribution of the dealer's non-bust outcomes (17-21)
+    # This is a simplification - full implementation would simulate all paths
+    DEALER_FINAL_SHARES = {17: 0.145, 18: 0.139, 19: 0.134, 20: 0.359, 21: 0.223}
+
+    # Count-based deviations by (hard_total, dealer_value): the advantage (%)
+    # at which they apply, the basic actions they override, the action taken
+    # instead and its reason (formatted with the advantage)
+    COUNT_DEVIATIONS = {
+        (16, 10): (0.5, ("HIT", "SURRENDER"), "STAND", "High count (+{:.1f}%) favors standing"),
+        (15, 10): (1.0, ("SURRENDER",), "STAND", "Very high count (+{:.1f}%) favors standing"),
+        (12, 3):  (0.8, ("HIT",), "STAND", "High count (+{:.1f}%) favors standing"),
+        (12, 2):  (1.0, ("HIT",), "STAND", "High count (+{:.1f}%) favors standing"),
+        (10, 10): (1.5, ("HIT",), "DOUBLE", "Very high count (+{:.1f}%) favors doubling"),
+        (10, 11): (1.5, ("HIT",), "DOUBLE", "Very high count (+{:.1f}%) favors doubling"),
+        (9, 2):   (0.5, ("HIT",), "DOUBLE", "High count (+{:.1f}%) favors doubling"),
+    }
+
     def __init__(self, composition_tracker):
         self.composition_tracker = composition_tracker
 
@@ -355,17 +711,9 @@ class StrategyEngine:
         Calculate hand value(s) for a list of cards
         Returns (hard_total, soft_total) or (total, None) if no ace
         """
-        total = 0
-        aces = 0
-
-        for card in cards:
-            if card in ['J', 'Q', 'K']:
-                total += 10
-            elif card == 'A':
-                aces += 1
-                total += 11
-            else:
-                total += int(card)
+        card_values = self.CARD_VALUES
+        total = sum(card_values[card] for card in cards)
+        aces = cards.count('A')
 
         # Adjust for aces
         while total > 21 and aces > 0:
@@ -385,8 +733,8 @@ class StrategyEngine:
             return False
 
         # Normalize 10-value cards
-        card1 = '10' if cards[0] in ['10', 'J', 'Q', 'K'] else cards[0]
-        card2 = '10' if cards[1] in ['10', 'J', 'Q', 'K'] else cards[1]
+        card1 = '10' if cards[0] in self.TEN_VALUE else cards[0]
+        card2 = '10' if cards[1] in self.TEN_VALUE else cards[1]
 
         return card1 == card2
 
@@ -404,7 +752,7 @@ class StrategyEngine:
         Returns: Recommended action string
         """
         # Normalize dealer upcard
-        dealer_value = 10 if dealer_upcard in ['J', 'Q', 'K'] else (11 if dealer_upcard == 'A' else int(dealer_upcard))
+        dealer_value = self.CARD_VALUES[dealer_upcard]
 
         # Check for pair first
         if can_split and self.is_pair(player_cards):
@@ -420,110 +768,31 @@ class StrategyEngine:
         # Hard hands
         return self._get_hard_strategy(hard_total, dealer_value, can_double, can_surrender)
 
+    def _chart_action(self, chart, row, dealer_value, can_double, can_surrender=False):
+        """Look up a basic strategy chart cell and resolve conditional actions"""
+        code = chart[row][dealer_value - 2]
+        if code == 'D':
+            return "DOUBLE" if can_double else "HIT"
+        if code == 'Ds':
+            return "DOUBLE" if can_double else "STAND"
+        if code == 'R':
+            return "SURRENDER" if can_surrender else "HIT"
+        return self.CHART_ACTIONS[code]
+
     def _get_pair_strategy(self, card, dealer_value, can_double):
         """Basic strategy for pairs"""
         # Normalize to rank
-        rank = '10' if card in ['10', 'J', 'Q', 'K'] else card
-
-        if rank == 'A':
-            return "SPLIT"
-        elif rank == '10':
-            return "STAND"
-        elif rank == '9':
-            if dealer_value in [7, 10, 11]:
-                return "STAND"
-            return "SPLIT"
-        elif rank == '8':
-            return "SPLIT"
-        elif rank == '7':
-            if dealer_value <= 7:
-                return "SPLIT"
-            return "HIT"
-        elif rank == '6':
-            if dealer_value <= 6:
-                return "SPLIT"
-            return "HIT"
-        elif rank == '5':
-            if dealer_value <= 9:
-                return "DOUBLE" if can_double else "HIT"
-            return "HIT"
-        elif rank == '4':
-            if dealer_value in [5, 6]:
-                return "SPLIT"
-            return "HIT"
-        elif rank in ['2', '3']:
-            if dealer_value <= 7:
-                return "SPLIT"
-            return "HIT"
-
-        return "HIT"
+        rank = '10' if card in self.TEN_VALUE else card
+        return self._chart_action(self.PAIR_CHART, rank, dealer_value, can_double)
 
     def _get_soft_strategy(self, total, dealer_value, can_double):
         """Basic strategy for soft hands (hands with ace counted as 11)"""
-        if total >= 19:
-            return "STAND"
-        elif total == 18:
-            if dealer_value <= 6:
-                return "DOUBLE" if can_double else "STAND"
-            elif dealer_value in [7, 8]:
-                return "STAND"
-            else:
-                return "HIT"
-        elif total == 17:
-            if dealer_value in [3, 4, 5, 6]:
-                return "DOUBLE" if can_double else "HIT"
-            return "HIT"
-        elif total in [15, 16]:
-            if dealer_value in [4, 5, 6]:
-                return "DOUBLE" if can_double else "HIT"
-            return "HIT"
-        elif total in [13, 14]:
-            if dealer_value in [5, 6]:
-                return "DOUBLE" if can_double else "HIT"
-            return "HIT"
-        else:
-            return "HIT"
+        return self._chart_action(self.SOFT_CHART, min(max(total, 12), 19), dealer_value, can_double)
 
     def _get_hard_strategy(self, total, dealer_value, can_double, can_surrender):
         """Basic strategy for hard hands"""
-        if total >= 17:
-            return "STAND"
-        elif total == 16:
-            if can_surrender and dealer_value in [9, 10, 11]:
-                return "SURRENDER"
-            if dealer_value <= 6:
-                return "STAND"
-            return "HIT"
-        elif total == 15:
-            if can_surrender and dealer_value == 10:
-                return "SURRENDER"
-            if dealer_value <= 6:
-                return "STAND"
-            return "HIT"
-        elif total == 14:
-            if dealer_value <= 6:
-                return "STAND"
-            return "HIT"
-        elif total == 13:
-            if dealer_value <= 6:
-                return "STAND"
-            return "HIT"
-        elif total == 12:
-            if dealer_value in [4, 5, 6]:
-                return "STAND"
-            return "HIT"
-        elif total == 11:
-            return "DOUBLE" if can_double else "HIT"
-        elif total == 10:
-            if dealer_value <= 9:
-                return "DOUBLE" if can_double else "HIT"
-            return "HIT"
-        elif total == 9:
-            if dealer_value in [3, 4, 5, 6]:
-                return "DOUBLE" if can_double else "HIT"
-            return "HIT"
-        else:
-            return "HIT"
+        return self._chart_action(self.HARD_CHART, min(max(total, 8), 17), dealer_value,
+                                  can_double, can_surrender)
 
     def get_composition_deviation(self, player_cards, dealer_upcard, basic_action):
         """
@@ -535,7 +804,7 @@ class StrategyEngine:
         Returns: (should_deviate, new_action, reason) or (False, None, None)
         """
         hard_total, soft_total = self.get_hand_value(player_cards)
-        dealer_value = 10 if dealer_upcard in ['J', 'Q', 'K'] else (11 if dealer_upcard == 'A' else int(dealer_upcard))
+        dealer_value = self.CARD_VALUES[dealer_upcard]
 
         # Calculate EV for each possible action
         ev_stand = self._calculate_stand_ev(hard_total, dealer_upcard)
@@ -548,14 +817,14 @@ class StrategyEngine:
         if ev_stand > ev_hit:
             if basic_action in ["HIT", "SURRENDER"]:
                 # Deviation: Stand is better than basic strategy suggests
-                advantage = self.composition_tracker.calculate_player_advantage()
                 if abs(ev_stand - ev_hit) > 0.001:  # Significant EV difference
+                    advantage = self.composition_tracker.calculate_player_advantage()
                     return (True, "STAND", f"Composition analysis: Stand EV={ev_stand:.3f} > Hit EV={ev_hit:.3f} (Edge: {advantage:+.1f}%)")
         elif ev_hit > ev_stand:
             if basic_action in ["STAND"]:
                 # Deviation: Hit is better than basic strategy suggests
-                advantage = self.composition_tracker.calculate_player_advantage()
                 if abs(ev_hit - ev_stand) > 0.001:
+                    advantage = self.composition_tracker.calculate_player_advantage()
                     return (True, "HIT", f"Composition analysis: Hit EV={ev_hit:.3f} > Stand EV={ev_stand:.3f} (Edge: {advantage:+.1f}%)")
 
         # Check doubling opportunities with composition analysis
@@ -566,43 +835,16 @@ class StrategyEngine:
                     advantage = self.composition_tracker.calculate_player_advantage()
                     return (True, "DOUBLE", f"Composition analysis: Double EV={ev_double:.3f} > alternatives (Edge: {advantage:+.1f}%)")
 
-        # Original simple threshold-based deviations as fallback
-        advantage = self.composition_tracker.calculate_player_advantage()
+        # Original simple threshold-based deviations as fallback - only a
+        # few (total, upcard) spots have one
+        deviation = self.COUNT_DEVIATIONS.get((hard_total, dealer_value))
+        if deviation is None:
+            return (False, None, None)
 
-        # 16 vs 10: Stand instead of hit/surrender at high counts
-        if hard_total == 16 and dealer_value == 10 and advantage >= 0.5:
-            if basic_action in ["HIT", "SURRENDER"]:
-                return (True, "STAND", f"High count (+{advantage:.1f}%) favors standing")
-
-        # 15 vs 10: Stand instead of surrender at very high counts
-        if hard_total == 15 and dealer_value == 10 and advantage >= 1.0:
-            if basic_action == "SURRENDER":
-                return (True, "STAND", f"Very high count (+{advantage:.1f}%) favors standing")
-
-        # 12 vs 3: Stand instead of hit at high counts
-        if hard_total == 12 and dealer_value == 3 and advantage >= 0.8:
-            if basic_action == "HIT":
-                return (True, "STAND", f"High count (+{advantage:.1f}%) favors standing")
-
-        # 12 vs 2: Stand instead of hit at high counts
-        if hard_total == 12 and dealer_value == 2 and advantage >= 1.0:
-            if basic_action == "HIT":
-                return (True, "STAND", f"High count (+{advantage:.1f}%) favors standing")
-
-        # 10 vs 10: Double at very high counts
-        if hard_total == 10 and dealer_value == 10 and advantage >= 1.5:
-            if basic_action == "HIT":
-                return (True, "DOUBLE", f"Very high count (+{advantage:.1f}%) favors doubling")
-
-        # 10 vs A: Double at very high counts
-        if hard_total == 10 and dealer_value == 11 and advantage >= 1.5:
-            if basic_action == "HIT":
-                return (True, "DOUBLE", f"Very high count (+{advantage:.1f}%) favors doubling")
-
-        # 9 vs 2: Double at high counts
-        if hard_total == 9 and dealer_value == 2 and advantage >= 0.5:
-            if basic_action == "HIT":
-                return (True, "DOUBLE", f"High count (+{advantage:.1f}%) favors doubling")
+        threshold, from_actions, to_action, reason = deviation
+        advantage = self.composition_tracker.calculate_player_advantage()
+        if advantage >= threshold and basic_action in from_actions:
+            return (True, to_action, reason.format(advantage))
 
         # No deviation
         return (False, None, None)
@@ -657,8 +899,8 @@ class StrategyEngine:
         ev = 0.0
 
         # For each possible card we could draw
-        for rank in self.composition_tracker.ranks:
-            card_count = self.composition_tracker.remaining[rank]
+        remaining = self.composition_tracker.remaining_arr.tolist()
+        for rank, card_count in zip(self.composition_tracker.ranks, remaining):
             if card_count == 0:
                 continue
 
@@ -667,10 +909,8 @@ class StrategyEngine:
             # Determine card value
             if rank == 'A':
                 card_value = 11 if (player_total + 11 <= 21) else 1
-            elif rank in ['J', 'Q', 'K']:
-                card_value = 10
             else:
-                card_value = int(rank)
+                card_value = self.CARD_VALUES[rank]
 
             new_total = player_total + card_value
 
@@ -705,8 +945,8 @@ class StrategyEngine:
         ev = 0.0
 
         # For each possible card we could draw
-        for rank in self.composition_tracker.ranks:
-            card_count = self.composition_tracker.remaining[rank]
+        remaining = self.composition_tracker.remaining_arr.tolist()
+        for rank, card_count in zip(self.composition_tracker.ranks, remaining):
             if card_count == 0:
                 continue
 
@@ -715,10 +955,8 @@ class StrategyEngine:
             # Determine card value
             if rank == 'A':
                 card_value = 11 if (player_total + 11 <= 21) else 1
-            elif rank in ['J', 'Q', 'K']:
-                card_value = 10
             else:
-                card_value = int(rank)
+                card_value = self.CARD_VALUES[rank]
 
             new_total = player_total + card_value
 
@@ -739,21 +977,12 @@ class StrategyEngine:
 
         Returns dict with probabilities for each final total and bust
         """
-        dealer_value = 10 if dealer_upcard in ['J', 'Q', 'K'] else (11 if dealer_upcard == 'A' else int(dealer_upcard))
-
         # Simplified model: Use dealer bust probability and distribute outcomes
         bust_prob = self.composition_tracker.get_dealer_bust_for_upcard(dealer_upcard) / 100.0
 
-        # Rough distribution of non-bust outcomes (17-21)
-        # This is a simplification - full implementation would simulate all paths
-        probs = {
-            'bust': bust_prob,
-            17: (1 - bust_prob) * 0.145,
-            18: (1 - bust_prob) * 0.139,
-            19: (1 - bust_prob) * 0.134,
-            20: (1 - bust_prob) * 0.359,
-            21: (1 - bust_prob) * 0.223
-        }
+        # Split the non-bust outcomes (17-21) by their rough shares
+        probs = {total: (1 - bust_prob) * share for total, share in self.DEALER_FINAL_SHARES.items()}
+        probs['bust'] = bust_prob
 
         return probs
 
@@ -782,22 +1011,42 @@ class StrategyEngine:
 class ScreenCapture:
     """Handles screen capture for card detection"""
 
+    # Where the last selected capture region is remembered between runs
+    REGION_FILE = os.path.join(os.path.expanduser("~"), ".blackjack_counter_region.json")
+
     def __init__(self, monitor_number=1):
-        self.sct = mss.mss()
+        # mss handles are thread-affine, so the grabber is created lazily
+        # on the thread that captures (see _ensure)
+        self.sct = None
+        self._sct_thread = None
         self.monitor_number = monitor_number
-        self.monitor = self.sct.monitors[monitor_number]
+        self.monitor = None
+        self.load_region()
 
-    def capture_frame(self):
-        """Capture a single frame from the screen"""
-        screenshot = self.sct.grab(self.monitor)
+    def _ensure(self):
+        """Create the mss grabber on the calling thread if needed"""
+        if self.sct is None or self._sct_thread != threading.get_ident():
+            self.sct = mss.mss()
+            self._sct_thread = threading.get_ident()
 
-        # Convert to numpy array
-        frame = np.array(screenshot)
+        if self.monitor is None:
+            # Keep only the geometry keys - mss inspects this dict on every grab
+            monitor = self.sct.monitors[self.monitor_number]
+            self.set_region(monitor["left"], monitor["top"], monitor["width"], monitor["height"])
 
-        # Convert from BGRA to BGR
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    def capture_frame(self):
+        """
+        Capture a single frame from the screen
 
-        return frame
+        Returns the raw BGRA pixels as a zero-copy view of the mss buffer -
+        detection converts straight to grayscale, so no BGR copy is made
+        """
+        self._ensure()
+        screenshot = self.sct.grab(self.monitor)
+
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4
+        )
 
     def set_region(self, x, y, width, height):
         """Set a specific region to capture"""
@@ -808,10 +1057,39 @@ class ScreenCapture:
             "height": height
         }
 
+    def load_region(self):
+        """
+        Restore the region saved by save_region, if any
+        Returns: True if a region was loaded (otherwise the full monitor is captured)
+        """
+        try:
+            with open(self.REGION_FILE) as f:
+                region = json.load(f)
+            self.set_region(int(region["left"]), int(region["top"]),
+                            int(region["width"]), int(region["height"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+    def save_region(self):
+        """Remember the current region for the next run"""
+        if self.monitor is None:
+            return
+        try:
+            with open(self.REGION_FILE, "w") as f:
+                json.dump(self.monitor, f)
+        except OSError as e:
+            print(f"Could not save capture region: {e}")
+
 
 class BlackjackCounterGUI:
     """GUI for displaying composition tracking and optimal betting"""
 
+    # Lower bounds of the color tiers above the lowest one (see _tier_colors)
+    BET_TIERS = (2.0, 3.0, 5.0)
+    ADVANTAGE_TIERS = (0.0, 0.5, 1.0)
+    BUST_TIERS = (26.0, 29.0, 32.0)
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Elite Blackjack Pro - Composition Tracker")
@@ -835,6 +1113,23 @@ class BlackjackCounterGUI:
 
         self.root.configure(bg=self.colors['bg_main'])
 
+        # Text color per recommended action
+        self._action_colors = {
+            "HIT": self.colors['warning'],      # Orange
+            "STAND": self.colors['info'],       # Blue
+            "DOUBLE": self.colors['success'],   # Green
+            "SPLIT": "#9C27B0",                 # Purple
+            "SURRENDER": self.colors['danger']  # Red
+        }
+
+        # Text color per tier, lowest tier first
+        self._tier_colors = {
+            # Gold for min bet, orange, medium green, bright green
+            'bet': (self.colors['accent_gold_dark'], self.colors['warning'], '#00A040', self.colors['success']),
+            # Higher advantage / dealer bust probability = better for player
+            'edge': (self.colors['danger'], self.colors['warning'], '#66BB6A', self.colors['success']),
+        }
+
         # Create canvas with scrollbar for scrollable content
         self.canvas = tk.Canvas(self.root, bg=self.colors['bg_main'], highlightthickness=0)
         self.scrollbar = tk.Scrollbar(self.root, orient="vertical", command=self.canvas.yview)
@@ -866,9 +1161,45 @@ class BlackjackCounterGUI:
         self.composition_tracker = CompositionTracker(num_decks=8)
         self.strategy_engine = StrategyEngine(self.composition_tracker)
 
+        # Ranks counted by each key card label, as a slice of the tracker's
+        # rank order (10/J/Q/K are adjacent, so '10-val' is one slice too)
+        ranks = self.composition_tracker.ranks
+        self._composition_slots = []
+        for rank, label in self.composition_labels.items():
+            if rank == '10-val':
+                slot = slice(ranks.index('10'), ranks.index('K') + 1)
+            else:
+                slot = slice(ranks.index(rank), ranks.index(rank) + 1)
+            self._composition_slots.append((label, slot))
+
         # Control flags
         self.is_running = False
-        self.scan_thread = None
+
+        # Scan worker, the in-flight pass and the pending root.after job
+        self._executor = None
+        self._scan_future = None
+        self._scan_job = None
+        self._idle_frames = 0
+
+        # Hash of the frame[::16, ::16] pixel grid of the last frame that went
+        # through detection, owned by the scan worker; the Tk thread sets
+        # _rehash to have the next frame detected even if it looks unchanged
+        self._last_hash = None
+        self._rehash = threading.Event()
+
+        # Last options applied to each display label (see _set_label), and
+        # whether a coalesced update is queued (see schedule_display)
+        self._label_options = {}
+        self._display_pending = False
+
+        # Composition version last drawn by update_display
+        self._rendered_version = None
+
+        # Card buttons with a highlight reset already scheduled (see _unflash)
+        self._flash_pending = set()
+
+        # Cards currently on screen, so each is counted once
+        self.card_tracker = CardTracker()
 
     def _on_mousewheel(self, event):
         """Handle mouse wheel scrolling"""
@@ -1332,6 +1663,22 @@ class BlackjackCounterGUI:
         )
         self.reset_button.pack(side=tk.LEFT, padx=8)
 
+        self.region_button = tk.Button(
+            button_frame,
+            text="▣ Select Region",
+            command=self.select_region,
+            bg=self.colors['info'],
+            fg='#FFFFFF',
+            activebackground='#0288D1',
+            font=("Palatino", 11, "bold"),
+            width=15,
+            height=2,
+            relief=tk.RAISED,
+            bd=3,
+            cursor='hand2'
+        )
+        self.region_button.pack(side=tk.LEFT, padx=8)
+
         # ===== Footer =====
         footer_frame = tk.Frame(self.scrollable_frame, bg=self.colors['bg_dark'], height=40)
         footer_frame.pack(fill=tk.X, pady=(20, 0))
@@ -1345,67 +1692,68 @@ class BlackjackCounterGUI:
             pady=12
         ).pack()
 
+    def _set_label(self, label, **options):
+        """
+        Configure a display label, skipping options that already hold the
+        given value so unchanged numbers don't trigger a Tk relayout
+        Only for labels that are configured solely through this method
+        """
+        last = self._label_options.setdefault(label, {})
+        changed = {key: value for key, value in options.items() if last.get(key) != value}
+        if changed:
+            label.config(**changed)
+            last.update(changed)
+
+    def schedule_display(self):
+        """
+        Request a display update once the Tk event queue is idle
+        Several changes in a row (rapid card clicks, a scan result) share one redraw
+        """
+        if not self._display_pending:
+            self._display_pending = True
+            self.root.after_idle(self._flush_display)
+
+    def _flush_display(self):
+        """Run the display update requested by schedule_display"""
+        self._display_pending = False
+        self.update_display()
+
     def update_display(self):
         """Update the display with current composition and betting info"""
+        # Nothing to redraw if the composition hasn't changed since the last update
+        if self.composition_tracker.version == self._rendered_version:
+            return
+        self._rendered_version = self.composition_tracker.version
+
         advantage = self.composition_tracker.calculate_player_advantage()
         optimal_bet = self.composition_tracker.get_kelly_bet()
         cards_remaining = self.composition_tracker.get_total_remaining()
         penetration = self.composition_tracker.get_penetration_percentage()
 
         # Update optimal bet (main display) - stays white background, change text color
-        self.bet_label.config(text=f"{optimal_bet:.1f} units")
-
         # Color code based on bet size (using new luxurious colors)
-        if optimal_bet >= 5.0:
-            self.bet_label.config(fg=self.colors['success'])  # Bright green
-        elif optimal_bet >= 3.0:
-            self.bet_label.config(fg='#00A040')  # Medium green
-        elif optimal_bet >= 2.0:
-            self.bet_label.config(fg=self.colors['warning'])  # Orange
-        else:
-            self.bet_label.config(fg=self.colors['accent_gold_dark'])  # Gold for min bet
+        bet_color = self._tier_colors['bet'][bisect.bisect_right(self.BET_TIERS, optimal_bet)]
+        self._set_label(self.bet_label, text=f"{optimal_bet:.1f} units", fg=bet_color)
 
         # Update advantage display
-        self.advantage_label.config(text=f"{advantage:+.3f}%")
-
-        if advantage >= 1.0:
-            self.advantage_label.config(fg=self.colors['success'])
-        elif advantage >= 0.5:
-            self.advantage_label.config(fg='#66BB6A')  # Light green
-        elif advantage >= 0.0:
-            self.advantage_label.config(fg=self.colors['warning'])
-        else:
-            self.advantage_label.config(fg=self.colors['danger'])
+        advantage_color = self._tier_colors['edge'][bisect.bisect_right(self.ADVANTAGE_TIERS, advantage)]
+        self._set_label(self.advantage_label, text=f"{advantage:+.3f}%", fg=advantage_color)
 
         # Update dealer bust probability
         dealer_bust = self.composition_tracker.calculate_dealer_bust_probability()
-        self.bust_label.config(text=f"{dealer_bust:.1f}%")
 
         # Color code: higher bust probability = better for player
-        if dealer_bust >= 32.0:
-            self.bust_label.config(fg=self.colors['success'])  # High bust chance - very good
-        elif dealer_bust >= 29.0:
-            self.bust_label.config(fg='#66BB6A')  # Above average - good
-        elif dealer_bust >= 26.0:
-            self.bust_label.config(fg=self.colors['warning'])  # Slightly below average
-        else:
-            self.bust_label.config(fg=self.colors['danger'])  # Low bust chance - bad for player
+        bust_color = self._tier_colors['edge'][bisect.bisect_right(self.BUST_TIERS, dealer_bust)]
+        self._set_label(self.bust_label, text=f"{dealer_bust:.1f}%", fg=bust_color)
 
         # Update card counts
-        self.cards_remaining_label.config(text=str(cards_remaining))
-        self.penetration_label.config(text=f"{penetration:.1f}%")
+        self._set_label(self.cards_remaining_label, text=str(cards_remaining))
+        self._set_label(self.penetration_label, text=f"{penetration:.1f}%")
 
         # Update key card composition
-        for rank, label in self.composition_labels.items():
-            if rank == '10-val':
-                # Combine all 10-value cards (10, J, Q, K)
-                count = (self.composition_tracker.remaining['10'] +
-                        self.composition_tracker.remaining['J'] +
-                        self.composition_tracker.remaining['Q'] +
-                        self.composition_tracker.remaining['K'])
-            else:
-                count = self.composition_tracker.remaining[rank]
-            label.config(text=str(count))
+        remaining = self.composition_tracker.remaining_arr.tolist()
+        for label, slot in self._composition_slots:
+            self._set_label(label, text=str(sum(remaining[slot])))
 
         # Update status
         if advantage >= 0.5:
@@ -1424,19 +1772,17 @@ class BlackjackCounterGUI:
         """Calculate and display recommended action based on player hand and dealer upcard"""
         try:
             # Parse player hand
-            player_hand_str = self.player_hand_entry.get().strip()
-            player_cards = [card.strip().upper() for card in player_hand_str.split(',')]
+            player_cards = self._parse_cards(self.player_hand_entry.get())
 
             # Parse dealer upcard
             dealer_upcard = self.dealer_upcard_entry.get().strip().upper()
 
             # Validate inputs
-            valid_ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-            for card in player_cards:
-                if card not in valid_ranks:
-                    self.action_label.config(text="INVALID HAND", fg="red")
-                    self.action_reason_label.config(text="Use format: 10,6 or A,5")
-                    return
+            valid_ranks = StrategyEngine.CARD_VALUES
+            if not player_cards or not valid_ranks.keys() >= set(player_cards):
+                self.action_label.config(text="INVALID HAND", fg="red")
+                self.action_reason_label.config(text="Use format: 10,6 or A,5")
+                return
 
             if dealer_upcard not in valid_ranks:
                 self.action_label.config(text="INVALID DEALER", fg="red")
@@ -1448,102 +1794,137 @@ class BlackjackCounterGUI:
                 player_cards, dealer_upcard
             )
 
-            # Update display
-            self.action_label.config(text=action)
-            self.action_reason_label.config(text=reason)
-
-            # Color code the action (using luxurious theme)
-            action_colors = {
-                "HIT": self.colors['warning'],      # Orange
-                "STAND": self.colors['info'],       # Blue
-                "DOUBLE": self.colors['success'],   # Green
-                "SPLIT": "#9C27B0",                 # Purple
-                "SURRENDER": self.colors['danger']  # Red
-            }
-
-            action_color = action_colors.get(action, self.colors['info'])
-            self.action_label.config(fg=action_color)
-
-            # Highlight if deviation from basic strategy
+            # Update display - color code the action (using luxurious theme) and
+            # highlight deviations from basic strategy, one config call per label
             if is_deviation:
-                self.action_label.config(fg=self.colors['accent_gold_dark'])  # Gold for deviations
-                self.action_reason_label.config(fg='#E67E22', font=("Palatino", 9, "italic", "bold"))
+                self.action_label.config(text=action, fg=self.colors['accent_gold_dark'])  # Gold for deviations
+                self.action_reason_label.config(text=reason, fg='#E67E22', font=("Palatino", 9, "italic", "bold"))
             else:
-                self.action_reason_label.config(fg="#7F8C8D", font=("Palatino", 9, "italic"))
+                action_color = self._action_colors.get(action, self.colors['info'])
+                self.action_label.config(text=action, fg=action_color)
+                self.action_reason_label.config(text=reason, fg="#7F8C8D", font=("Palatino", 9, "italic"))
 
         except Exception as e:
             self.action_label.config(text="ERROR", fg="red")
             self.action_reason_label.config(text=str(e))
 
+    @staticmethod
+    def _parse_cards(text):
+        """Split a card entry such as '10,K' or '10 K' into upper-case ranks"""
+        return text.upper().replace(',', ' ').split()
+
     def add_card_manual(self, rank):
         """Add a single card to the composition tracker"""
         success = self.composition_tracker.add_card(rank)
         if success:
             # Visual feedback - briefly highlight the button
             self.card_buttons[rank].config(bg=self.colors['success'], fg='#FFFFFF')
-            self.root.after(200, lambda: self.card_buttons[rank].config(bg='#FFFFFF', fg='#2C3E50'))
             # Update the display
-            self.update_display()
+            self.schedule_display()
         else:
             # Card not available (shouldn't happen in normal use)
             self.card_buttons[rank].config(bg=self.colors['danger'], fg='#FFFFFF')
-            self.root.after(200, lambda: self.card_buttons[rank].config(bg='#FFFFFF', fg='#2C3E50'))
+
+        # At most one pending reset per button, however fast it is clicked
+        if rank not in self._flash_pending:
+            self._flash_pending.add(rank)
+            self.root.after(200, self._unflash, rank)
+
+    def _unflash(self, rank):
+        """Restore a card button's normal colors after the click highlight"""
+        self._flash_pending.discard(rank)
+        self.card_buttons[rank].config(bg='#FFFFFF', fg='#2C3E50')
 
     def add_multiple_cards(self):
         """Add multiple cards from text entry"""
-        cards_str = self.multi_card_entry.get().strip().upper()
-        if not cards_str:
+        cards = self._parse_cards(self.multi_card_entry.get())
+        if not cards:
             return
 
-        # Parse cards - support both comma and space separation
-        cards_str = cards_str.replace(',', ' ')
-        cards = [c.strip() for c in cards_str.split() if c.strip()]
-
-        valid_ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        added_count = 0
-
-        for card in cards:
-            if card in valid_ranks:
-                if self.composition_tracker.add_card(card):
-                    added_count += 1
+        # One batched update - unknown ranks and exhausted ranks are skipped
+        added_count = self.composition_tracker.add_cards(cards)
 
         if added_count > 0:
-            self.update_display()
+            self.schedule_display()
             self.multi_card_entry.delete(0, tk.END)
             # Show feedback
             self.multi_card_entry.config(bg=self.colors['success'])
             self.root.after(500, lambda: self.multi_card_entry.config(bg='#FFFFFF'))
 
-    def scan_loop(self):
-        """Main scanning loop running in separate thread"""
-        prev_cards = set()
-
-        while self.is_running:
-            try:
-                # Capture frame
-                frame = self.screen_capture.capture_frame()
-
-                # Detect cards
-                detected_cards = self.card_detector.detect_cards(frame)
-
-                # Add new cards to tracker
-                current_cards = set(detected_cards)
-                new_cards = current_cards - prev_cards
-
-                for card_rank in new_cards:
-                    self.composition_tracker.add_card(card_rank)
+    def _scan_tick(self):
+        """Submit one capture + detect pass to the scan worker"""
+        if not self.is_running:
+            return
+        self._scan_future = self._executor.submit(self._capture_and_detect)
+        self._scan_job = self.root.after(20, self._poll_scan, self._scan_future)
 
-                prev_cards = current_cards
+    def _poll_scan(self, future):
+        """
+        Wait for a scan pass from the Tk thread - Tk is never called
+        from the scan worker
+        """
+        if future.done():
+            self._on_detect(future)
+        elif self.is_running and future is self._scan_future:
+            self._scan_job = self.root.after(20, self._poll_scan, future)
 
-                # Update display
-                self.root.after(0, self.update_display)
+    def _capture_and_detect(self):
+        """
+        Capture a frame and detect the cards on it (runs on the scan worker)
+        Returns: list of detections, or None when the screen hasn't changed
+        """
+        # Honor a rehash request before capturing, so the frame it asks
+        # for is never skipped
+        if self._rehash.is_set():
+            self._rehash.clear()
+            self._last_hash = None
+
+        frame = self.screen_capture.capture_frame()
+
+        # Skip detection when the screen hasn't changed since the last
+        # frame - a card entering the frame always changes pixels on a
+        # 16 px grid, so hashing that subsample (1/256 of the frame) is enough
+        frame_hash = hash(frame[::16, ::16].tobytes())
+        if frame_hash == self._last_hash:
+            return None
+        self._last_hash = frame_hash
+
+        return self.card_detector.detect_cards(frame)
+
+    def _on_detect(self, future):
+        """Apply a finished scan pass and schedule the next one (Tk thread)"""
+        # Results of a pass that outlived its scanning session are dropped
+        if not self.is_running or future is not self._scan_future:
+            return
 
-                # Sleep briefly to control CPU usage
-                time.sleep(0.5)
+        try:
+            detected_cards = future.result()
+        except Exception as e:
+            print(f"Error in scan loop: {e}")
+            self._scan_job = self.root.after(1000, self._scan_tick)
+            return
 
-            except Exception as e:
-                print(f"Error in scan loop: {e}")
-                time.sleep(1)
+        added = 0
+        if detected_cards is None:
+            # Unchanged screen - the cards of the last pass are still there
+            self.card_tracker.repeat()
+        else:
+            # Add new cards to tracker - a card is new when it doesn't
+            # continue the track of a card already on screen
+            new_ranks = self.card_tracker.update(detected_cards)
+            added = self.composition_tracker.add_cards(new_ranks)
+            if added:
+                self.schedule_display()
+
+        # Deals are bursty: poll quickly right after a new card, then
+        # back off (0.5 s up to 2 s) while the table is quiet
+        if added:
+            self._idle_frames = 0
+            interval = 0.25
+        else:
+            interval = min(2.0, 0.5 * 1.5 ** self._idle_frames)
+            self._idle_frames = min(self._idle_frames + 1, 4)
+        self._scan_job = self.root.after(int(interval * 1000), self._scan_tick)
 
     def start_scanning(self):
         """Start the card scanning process"""
@@ -1552,20 +1933,88 @@ class BlackjackCounterGUI:
         self.stop_button.config(state=tk.NORMAL)
         self.status_label.config(text="⚡ SCANNING IN PROGRESS • Detecting Cards", fg=self.colors['info'])
 
-        # Start scanning in separate thread
-        self.scan_thread = threading.Thread(target=self.scan_loop, daemon=True)
-        self.scan_thread.start()
+        # Capture and detection run on a single worker thread (mss handles
+        # are thread-affine); results are applied on the Tk thread
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan")
+        self._idle_frames = 0
+        self._scan_tick()
 
     def stop_scanning(self):
         """Stop the card scanning process"""
         self.is_running = False
+        self._scan_future = None
+        if self._scan_job is not None:
+            self.root.after_cancel(self._scan_job)
+            self._scan_job = None
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.status_label.config(text="⏸ SCANNING STOPPED • Ready to Resume", fg=self.colors['text_gold'])
 
+    def select_region(self):
+        """Let the user drag a rectangle over the screen to choose the capture region"""
+        overlay = tk.Toplevel(self.root)
+        overlay.attributes('-fullscreen', True)
+        overlay.attributes('-topmost', True)
+        overlay.attributes('-alpha', 0.3)
+
+        canvas = tk.Canvas(overlay, bg='black', cursor='crosshair', highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+        selection = canvas.create_rectangle(0, 0, 0, 0, outline=self.colors['accent_gold'], width=3)
+        start = {}
+
+        def on_press(event):
+            start['x'], start['y'] = event.x, event.y
+            start['x_root'], start['y_root'] = event.x_root, event.y_root
+
+        def on_drag(event):
+            if start:
+                canvas.coords(selection, start['x'], start['y'], event.x, event.y)
+
+        def on_release(event):
+            overlay.destroy()
+            if not start:
+                return
+            left, right = sorted((start['x_root'], event.x_root))
+            top, bottom = sorted((start['y_root'], event.y_root))
+
+            # Ignore accidental clicks
+            if right - left < 20 or bottom - top < 20:
+                return
+
+            old_region = self.screen_capture.monitor
+            self.screen_capture.set_region(left, top, right - left, bottom - top)
+            self.screen_capture.save_region()
+
+            # Card positions are relative to the region - move the live tracks
+            # into the new region's coordinates so cards already on the table
+            # aren't counted again
+            if old_region is not None:
+                self.card_tracker.shift(old_region["left"] - left, old_region["top"] - top)
+            self._rehash.set()
+
+            # A pass still running on the old region must not reach the
+            # tracker - a fresh pass supersedes it
+            if self.is_running:
+                self.root.after_cancel(self._scan_job)
+                self._scan_tick()
+            self.status_label.config(
+                text=f"▣ REGION SET • {right - left}×{bottom - top} at ({left}, {top})",
+                fg=self.colors['info']
+            )
+
+        canvas.bind("<ButtonPress-1>", on_press)
+        canvas.bind("<B1-Motion>", on_drag)
+        canvas.bind("<ButtonRelease-1>", on_release)
+        overlay.bind("<Escape>", lambda e: overlay.destroy())
+        overlay.focus_force()
+
     def reset_count(self):
         """Reset for new shoe"""
         self.composition_tracker.reset()
+        # The card tracker is kept: cards still on the table belong to the
+        # old shoe and must not be counted into the new one
+        self._rehash.set()
         self.update_display()
         self.status_label.config(text="♻ NEW SHOE INITIALIZED • Fresh Count", fg=self.colors['accent_gold'])
 